@@ -1,26 +1,121 @@
-from json import load, loads
-from time import time, sleep
-from typing import List, Set, Dict, Tuple, Optional, Any, Optional, cast
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from heapq import heappush, heappop
+from itertools import count
+from json import dumps, load, loads
+from logging import INFO
+from math import ceil
+from random import random, choice
+from time import time, time_ns, monotonic, sleep
+from typing import (
+    List, Set, Dict, Tuple, Optional, Any, Optional, Callable, Iterator,
+    cast
+)
 from uuid import uuid4
-from threading import Thread, Timer
+from threading import Thread, Condition, Lock
 
-from channels.generic.websocket import WebsocketConsumer
+import numpy
+from channels.generic.websocket import AsyncWebsocketConsumer
 from .settings import LOG, CONFIG
 
 
+class _TimerWheel:
+    '''Runs delayed callbacks from a single thread'''
+
+    def __init__(self) -> None:
+        # heap of [fire timestamp, sequence, callback, args] entries
+        # on monotonic clock, canceled entries have callback set to None
+        self._queue: List[list] = []
+        self._sequence: Any = count()
+        self._condition: Condition = Condition()
+        self._thread: Thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def schedule(
+        self,
+        fire_at: float,
+        callback: Callable[..., None],
+        *args: Any
+    ) -> list:
+        '''Schedules callback at monotonic timestamp and returns its handle'''
+
+        handle: list = [fire_at, next(self._sequence), callback, args]
+        with self._condition:
+            heappush(self._queue, handle)
+
+            # wake up only if new entry is the nearest one
+            if self._queue[0] is handle:
+                self._condition.notify()
+
+        return handle
+
+    def cancel(self, handle: list) -> None:
+        '''Marks scheduled callback as canceled'''
+
+        with self._condition:
+            handle[2] = None
+
+    def _run(self) -> None:
+        '''Fires due callbacks and sweeps canceled ones'''
+
+        while True:
+            with self._condition:
+                while True:
+                    if not self._queue:
+                        self._condition.wait()
+                        continue
+
+                    delay: float = self._queue[0][0] - monotonic()
+                    if delay > 0:
+                        self._condition.wait(delay)
+                        continue
+
+                    _, _, callback, args = heappop(self._queue)
+                    if callback is not None:
+                        break
+
+            try:
+                callback(*args)
+
+            except Exception as err:
+                LOG.error(
+                    'Scheduled callback has failed with' +
+                    ' the following error: %s', err)
+
+
+_WHEEL: _TimerWheel = _TimerWheel()
+
+
 class Exchange:
     '''Basic exchange'''
 
-    def __init__(self) -> None:
+    def __init__(self, name: str = 'mocker') -> None:
         self.initial_balance_value: float = 1.0
         self.strategy_check_timer_value: int = 10
 
-        self.active_accounts: List[ExchangeAccount]
-        self.coins: List[Strategy]
-        self.name: str
+        self.name: str = name
+
+        # account data by api key
+        self.active_accounts: Dict[str, dict] = {}
+
+        # strategies by symbol and assets they are traded in
+        self.coins: Dict[str, Strategy] = {}
+        self.assets: Set[str] = set()
+
+        # bounded history of orders on exchange
+        self.orders: deque = deque(
+            maxlen=CONFIG.get('orders_ringbuffer', 10000)
+        )
 
-        # list of all orders on exchange
-        self.orders: list = []
+        # state of all ingested strategies advanced in batches
+        # by a single scheduler thread
+        self._state: ExchangeState = ExchangeState()
+        self._scheduler: Thread = Thread(
+            target=self._run_scheduler, daemon=True
+        )
+        self._scheduler.start()
 
     def ingest_strategy(self, strategy: Strategy) -> None:
         '''Ingests strategies to exchange forming default symbols'''
@@ -30,60 +125,67 @@ class Exchange:
         # quote asset is USD
         base_asset, quote_asset = strategy.symbol.split('_')
 
-        LOG.info('Ingesting {} strategy to {} exchange'.format(
-            base_asset, self.name
-        ))
+        if LOG.isEnabledFor(INFO):
+            LOG.info(
+                'Ingesting %s strategy to %s exchange', base_asset, self.name
+            )
 
-        self.coins.append(strategy)
+        self.coins[strategy.symbol] = strategy
+        self.assets.update((base_asset, quote_asset))
+
+        # fill balances of already accepted accounts with new assets
+        for account_data in self.active_accounts.values():
+            balance: Dict[str, Dict[str, float]] = account_data['balance']
+            for asset in (base_asset, quote_asset):
+                balance['available'].setdefault(
+                    asset, self.initial_balance_value
+                )
+                balance['frozen'].setdefault(asset, 0.0)
 
         # set status for testing
-        strategy.status = 'READY'
+        strategy.status.value = 'READY'
 
-        # schedule strategy checl procedures
-        self._async_strategy_check(strategy)
+        # include strategy into batched check procedures
+        self._state.adopt(strategy)
 
-    def _async_strategy_check(self, strategy: Strategy) -> None:
-        '''Starts thread for strategy check'''
+    def iter_strategies(self) -> Iterator[Strategy]:
+        '''Iterates over ingested strategies'''
+        return iter(self.coins.values())
 
-        thread: Thread = Thread(
-            target=self._handle_strategy, args=(strategy,)
-        )
-        thread.start()
+    def prepare_ticker(self) -> List[dict]:
+        '''Provides current price of every symbol'''
+
+        return [
+            {'s': symbol, 'c': strategy._ticker_values[strategy.counter]}
+            for symbol, strategy in self.coins.items()
+        ]
 
-    def _handle_strategy(self, strategy: Strategy) -> None:
-        '''Checks strategy conditions every fixed period of time'''
+    def _run_scheduler(self) -> None:
+        '''Checks conditions of all strategies every fixed period of time'''
 
         while True:
             sleep(self.strategy_check_timer_value)
-            strategy.check_conditions()
+            self._state.check_conditions()
 
     def accept_account(self, api_key: str) -> None:
         '''Accepts api key and creates exchange account info'''
 
         if api_key not in self.active_accounts:
-            # create account info template
+            # create account info with filled balance
             account_data: dict = {
                 'balance': {
-                    'available': {},
-                    'frozen': {}
+                    'available': {
+                        coin: self.initial_balance_value
+                        for coin in self.assets
+                    },
+                    'frozen': dict.fromkeys(self.assets, 0.0)
                 }
             }
 
-            # fill account balance
-            for coin in self.assets:
-                account_data['balance']['available'].update({
-                    coin: self.initial_balance_value
-                })
+            self.active_accounts[api_key] = account_data
 
-                account_data['balance']['frozen'].update({
-                    coin: 0.0
-                })
-
-            self.active_accounts.update({
-                api_key: account_data
-            })
-
-            LOG.info('Api key {} successfully accepted'.format(api_key))
+            if LOG.isEnabledFor(INFO):
+                LOG.info('Api key %s successfully accepted', api_key)
 
     def create_order(
         self,
@@ -105,7 +207,8 @@ class Exchange:
             base_asset,
             quote_asset,
             order_type,
-            self.coins
+            self.coins,
+            exchange=self
         )
         self.orders.append(order)
 
@@ -113,69 +216,73 @@ class Exchange:
         balance: Dict[str, Dict[
             str, float
         ]] = self.active_accounts[api_key]['balance']
+        available: Dict[str, float] = balance['available']
+        frozen: Dict[str, float] = balance['frozen']
         if order_type == 'BUY':
-            balance['available'][quote_asset] -= order.price * order.amount
-            balance['frozen'][quote_asset] += order.price * order.amount
+            notional: float = order.price * order.amount
+            available[quote_asset] -= notional
+            frozen[quote_asset] += notional
 
         elif order_type == 'SELL':
-            balance['available'][base_asset] -= order.amount
-            balance['frozen'][base_asset] += order.amount
+            available[base_asset] -= order.amount
+            frozen[base_asset] += order.amount
 
-        LOG.info('Balances altered for api key {} due to order {}: {}'.format(
-            api_key,
-            order.id,
-            self.active_accounts[api_key]['balance']
-        ))
-
-        handle_order_close: Timer = Timer(
-            order.order_fill_delay + 1,
-            self._handle_order_close,
-            [order]
-        )
-        handle_order_close.start()
+        if LOG.isEnabledFor(INFO):
+            LOG.info(
+                'Balances altered for api key %s due to order %s: %s',
+                api_key, order.id, balance
+            )
 
     def current_time(self, mode: str ='secs') -> int:
         '''Provides current time'''
 
-        current_time: int = int(round(time()))
-
         if mode == 'millis':
-            return current_time * 1000
+            return time_ns() // 1_000_000
 
         else:
-            return current_time
+            return time_ns() // 1_000_000_000
 
     def _handle_order_close(self, order: Any) -> None:
-        '''Alters balances when order is closed'''
+        '''
+            Alters balances when order is filled or canceled:
+            credits filled part and returns unfilled part of
+            reserved amount
+        '''
 
         # find proper strategy
-        strategy: Any = [
-            strategy for strategy in self.coins
-            if strategy.symbol == order.symbol
-        ][0]
+        strategy: Any = self.coins[order.symbol]
 
-        order_traded_total_amount = sum(
-            [trade.amount for trade in order.trades])
-        order_traded_total = sum(
-            [trade.amount * trade.price for trade in order.trades])
+        order_traded_total_amount = order._filled_amount
+        order_traded_total = order._filled_notional
 
         order_original_total_amount = order.amount
         order_original_total = order.amount * order.price
 
         balance: Dict[str, Dict[
             str, float
-        ]] = self.active_accounts[api_key]['balance']
+        ]] = self.active_accounts[order.api_key]['balance']
+        available: Dict[str, float] = balance['available']
+        frozen: Dict[str, float] = balance['frozen']
+        is_filled: bool = order.status == 'FILLED'
         if order.order_type == 'BUY':
-            balance['available'][order.base_asset] += order_traded_total_amount
-            balance['frozen'][order.quote_asset] -= order_original_total
+            available[order.base_asset] += order_traded_total_amount
+            frozen[order.quote_asset] -= order_original_total
+            available[order.quote_asset] += (
+                order_original_total - order_traded_total
+            )
 
-            strategy.buys += 1
+            if is_filled:
+                strategy.record_buy()
 
         elif order.order_type == 'SELL':
-            balance['frozen'][order.base_asset] -= order_original_total_amount
-            balance['available'][order.quote_asset] += order_traded_total
+            frozen[order.base_asset] -= order_original_total_amount
+            available[order.base_asset] += (
+                order_original_total_amount - order_traded_total_amount
+            )
+            available[order.quote_asset] += order_traded_total
 
-            strategy.sells += 1
+            if is_filled:
+                strategy.record_sell()
 
 
 class Ticker:
@@ -192,42 +299,232 @@ class Ticker:
         self.is_infinite: bool = is_infinite
         self.is_triggered: bool = False
         self.counter: int = 0
-        self.incrementor: Optional[Thread] = None
         self.condition_start: Tuple[int] = condition_start
 
-    def check_conditions(self) -> None:
-        '''check conditions to start ticker'''
-        self._trigger()
-
-    def _trigger(self, speed: int = 1) -> None:
-        '''triggers counter with speed = counts/second'''
+        # seconds between counter increments once triggered
+        self._tick_interval: float = 1.0
 
-        # start async counter increment
-        self.incrementor = Thread(
-            target=self._increment_counter,
-            args=(speed,)
-        )
-        self.incrementor.start()
+    def check_conditions(self, speed: int = 1) -> None:
+        '''check conditions to start ticker with speed = counts/second'''
 
-        # indicate ticker is triggered
-        self.is_triggered = not self.is_triggered
+        if not self.is_triggered:
+            self.is_triggered = True
+            self._tick_interval = 1 / speed
+            _WHEEL.schedule(monotonic() + self._tick_interval, self._tick)
 
     def reset_counter(self) -> None:
         '''resets counter'''
         self.counter = 0
 
-    def _increment_counter(self, speed: int) -> None:
-        '''increments tickers counter'''
+    def _tick(self) -> None:
+        '''increments tickers counter and schedules next increment'''
 
-        wait_time: float = 1 / speed
-        while True:
-            sleep(wait_time)
-            self.counter += 1
+        # nothing to walk through
+        if not self.values:
+            return
 
-            # control counter
+        if self.is_infinite:
+            self.counter = (self.counter + 1) % len(self.values)
+
+        else:
+            self.counter = min(self.counter + 1, len(self.values) - 1)
+
+            # finite ticker stays on its last value
             if self.counter == len(self.values) - 1:
-                if self.is_infinite:
-                    self.reset_counter
+                return
+
+        _WHEEL.schedule(monotonic() + self._tick_interval, self._tick)
+
+
+# buys and sells are packed into one word as (buys << 32) | sells
+_DEALS_SHIFT: int = 32
+_DEALS_MASK: int = (1 << _DEALS_SHIFT) - 1
+
+
+class ExchangeState:
+    '''Columns of strategy session state indexed by strategy row'''
+
+    _COLUMNS: Tuple[Tuple[str, Any], ...] = (
+        ('counter', numpy.int32),
+        ('is_triggered', numpy.bool_),
+        ('is_infinite', numpy.bool_),
+        ('deals', numpy.uint64),
+        ('trig_deals', numpy.uint64),
+        ('stop_deals', numpy.uint64),
+        ('last_idx', numpy.int32),
+        ('loaded', numpy.bool_),
+    )
+
+    def __init__(self, capacity: int = 16) -> None:
+        self.size: int = 0
+        self.capacity: int = capacity
+        self.strategies: List[Optional[Strategy]] = []
+
+        # guards rows against concurrent ticks, writes and growth
+        self.lock: Lock = Lock()
+
+        for name, dtype in self._COLUMNS:
+            setattr(self, name, numpy.zeros(capacity, dtype=dtype))
+
+    def add(self, strategy: Strategy) -> int:
+        '''Allocates zeroed row for strategy and binds strategy to it'''
+
+        if self.size == self.capacity:
+            self._grow()
+
+        row: int = self.size
+        self.size += 1
+        self.strategies.append(strategy)
+
+        strategy._state = self
+        strategy._row = row
+        return row
+
+    def adopt(self, strategy: Strategy) -> int:
+        '''Moves strategy row from its current state into this one'''
+
+        source: ExchangeState = strategy._state
+        source_row: int = strategy._row
+
+        # strategy ingested again keeps its row
+        if source is self:
+            return source_row
+
+        # release source row so it is never ticked again
+        with source.lock:
+            values: List[Any] = [
+                getattr(source, name)[source_row]
+                for name, _ in self._COLUMNS
+            ]
+            source.loaded[source_row] = False
+            source.is_triggered[source_row] = False
+            source.strategies[source_row] = None
+
+        with self.lock:
+            row: int = self.add(strategy)
+
+            for (name, _), value in zip(self._COLUMNS, values):
+                getattr(self, name)[row] = value
+
+        return row
+
+    def load_params(self, row: int) -> None:
+        '''Copies parsed strategy params into row and resets its session'''
+
+        strategy: Strategy = self.strategies[row]
+
+        with self.lock:
+            self.is_infinite[row] = strategy.is_infinite
+            self.trig_deals[row] = self.pack_deals(*strategy._trig_bs)
+            self.stop_deals[row] = self.pack_deals(*strategy._stop_bs)
+            self.last_idx[row] = strategy._ticker_last_idx
+
+            self.counter[row] = 0
+            self.is_triggered[row] = False
+            self.loaded[row] = True
+
+    @staticmethod
+    def pack_deals(buys: int, sells: int) -> int:
+        '''Packs buys and sells counts into one word'''
+        return (buys << _DEALS_SHIFT) | sells
+
+    def set_counter(self, row: int, value: int) -> None:
+        '''Sets ticker counter of strategy'''
+
+        with self.lock:
+            self.counter[row] = value
+
+    def set_triggered(self, row: int, value: bool) -> None:
+        '''Sets trigger flag of strategy'''
+
+        with self.lock:
+            self.is_triggered[row] = value
+
+    def get_deals(self, row: int) -> int:
+        '''Reads packed buys and sells of strategy'''
+
+        with self.lock:
+            return int(self.deals[row])
+
+    def record_deal(self, row: int, is_buy: bool) -> None:
+        '''Counts closed buy or sell order of strategy'''
+
+        with self.lock:
+            self.deals[row] += (1 << _DEALS_SHIFT) if is_buy else 1
+
+    def check_conditions(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None
+    ) -> None:
+        '''Advances strategies in rows range and handles status changes'''
+
+        infinite, triggered, done = self.tick(start, stop)
+        strategies: List[Any] = self.strategies
+
+        for row in infinite:
+            strategies[row]._start_infinite()
+
+        for row in triggered:
+            strategies[row]._start_price_change()
+
+        for row in done:
+            strategies[row]._check_success()
+
+    def tick(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None
+    ) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        '''
+            Advances strategies in rows range by one check and returns
+            rows of infinite strategies started, strategies triggered
+            by price change and finite strategies reached their end
+        '''
+
+        with self.lock:
+            rows: slice = slice(start, self.size if stop is None else stop)
+            counter: numpy.ndarray = self.counter[rows]
+            is_triggered: numpy.ndarray = self.is_triggered[rows]
+            is_infinite: numpy.ndarray = self.is_infinite[rows]
+
+            # rows without parsed params or released ones stay idle
+            loaded: numpy.ndarray = self.loaded[rows]
+
+            infinite_start: numpy.ndarray = (
+                loaded & is_infinite & ~is_triggered
+            )
+            is_triggered |= infinite_start
+
+            # triggered strategies walk their ticker, infinite ones wrap
+            # and finite ones are left for success check
+            active: numpy.ndarray = loaded & is_triggered
+            last_idx: numpy.ndarray = self.last_idx[rows]
+            at_end: numpy.ndarray = active & (counter == last_idx)
+            done: numpy.ndarray = at_end & ~is_infinite
+            counter += active & (counter < last_idx)
+            counter[at_end & is_infinite] = 0
+
+            price_start: numpy.ndarray = (
+                loaded & ~active & (counter == 0) &
+                (self.deals[rows] == self.trig_deals[rows])
+            )
+            is_triggered |= price_start
+
+        return (
+            numpy.flatnonzero(infinite_start) + start,
+            numpy.flatnonzero(price_start) + start,
+            numpy.flatnonzero(done) + start
+        )
+
+    def _grow(self) -> None:
+        '''Doubles capacity of every column'''
+
+        self.capacity *= 2
+        for name, dtype in self._COLUMNS:
+            column: numpy.ndarray = numpy.zeros(self.capacity, dtype=dtype)
+            column[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, column)
 
 
 class StrategyStatus:
@@ -235,7 +532,7 @@ class StrategyStatus:
 
     def __init__(self, value: str) -> None:
         self._value: str = value
-        self.last_set: int = self._current_time()
+        self.last_set: int = time_ns() // 1_000_000
 
     def __repr__(self) -> str:
         return 'Status value: \'{}\'. Set at: {}'.format(
@@ -243,16 +540,13 @@ class StrategyStatus:
             self.last_set
         )
 
-    def _current_time(self) -> int:
-        return int(round(time() * 1000))
-
     @property
     def value(self) -> str:
         return self._value
 
     @value.setter
     def value(self, value: str) -> None:
-        self.last_set = self._current_time()
+        self.last_set = time_ns() // 1_000_000
         self._value = value
 
 
@@ -274,14 +568,52 @@ class Strategy:
         self.symbol: str = symbol
         self.status: StrategyStatus = StrategyStatus('INITIALIZED')
 
-        # strategy session fields
-        self.buys: int = 0
-        self.sells: int = 0
+        # strategy session fields live in a row of exchange state
+        self._state: ExchangeState
+        self._row: int
+        ExchangeState(capacity=1).add(self)
+
+    @property
+    def counter(self) -> int:
+        return int(self._state.counter[self._row])
+
+    @counter.setter
+    def counter(self, value: int) -> None:
+        self._state.set_counter(self._row, value)
+
+    @property
+    def is_triggered(self) -> bool:
+        return bool(self._state.is_triggered[self._row])
+
+    @is_triggered.setter
+    def is_triggered(self, value: bool) -> None:
+        self._state.set_triggered(self._row, value)
+
+    @property
+    def buys(self) -> int:
+        return int(self._state.deals[self._row]) >> _DEALS_SHIFT
+
+    @property
+    def sells(self) -> int:
+        return int(self._state.deals[self._row]) & _DEALS_MASK
+
+    def record_buy(self) -> None:
+        self._state.record_deal(self._row, True)
+
+    def record_sell(self) -> None:
+        self._state.record_deal(self._row, False)
+
+    def _deals(self) -> Tuple[int, int]:
+        '''Reads buys and sells as one consistent pair'''
+
+        deals: int = self._state.get_deals(self._row)
+        return deals >> _DEALS_SHIFT, deals & _DEALS_MASK
 
     def _parse_params_from_query_set(self, query_set: Any) -> None:
         params: CoinParams = query_set
 
         self.ticker = loads(params.ticker)
+        self.is_infinite = params.is_infinite
         self.name = params.name
         self.description = params.description
         self.trigger = loads(params.trigger)
@@ -289,67 +621,46 @@ class Strategy:
         self.request_payload = loads(params.request_payload)
         self.symbol = params.currency_pair
 
-        # reset counter when parsing new strategy params
-        self.reset_counter()
-
-    def check_conditions(self) -> None:
-
-        if self.is_infinite:
-            if not self.is_triggered:
-                self.is_triggered = True
-                LOG.info(
-                    'Infinite strategy' +
-                    ' "{}" has been triggered'.format(self.name)
-                )
-                self.status = 'INFINITE_LOOP'
-
-        if self.is_triggered:
+        # cache parsed ticker values for per-tick and per-deal access
+        self._ticker_values: List[float] = [
+            float(value) for value in self.ticker['ticker']
+        ]
+        self._ticker_last_idx: int = len(self._ticker_values) - 1
 
-            if self.counter == len(self.ticker['ticker']) - 1:
-
-                if not self.is_infinite:
-                    self._check_success()
-
-                else:
-                    # reset infinite strategy
-                    self._increment_counter()
+        # (buys, sells) pairs compared on every check
+        self._trig_bs: Tuple[int, int] = (
+            self.trigger['buys'], self.trigger['sells']
+        )
+        self._stop_bs: Tuple[int, int] = (
+            self.stop_trigger['buys'], self.stop_trigger['sells']
+        )
 
-            else:
-                self._increment_counter()
+        # refresh state row and reset counter with new strategy params
+        self._state.load_params(self._row)
 
-        else:
+    def check_conditions(self) -> None:
+        '''Checks conditions of this strategy alone'''
+        self._state.check_conditions(self._row, self._row + 1)
 
-            if self.counter == 0:
+    def _start_infinite(self) -> None:
+        LOG.info('Infinite strategy "%s" has been triggered', self.name)
+        self.status.value = 'INFINITE_LOOP'
 
-                if (self.buys == self.trigger['buys'] and
-                        self.sells == self.trigger['sells']):
-                    LOG.info(
-                        'Coin "{}" has been triggered.'.format(self.name)
-                    )
-                    self.is_triggered = True
-                    self.status = 'PRICE_CHANGE_TRIGGERED'
+    def _start_price_change(self) -> None:
+        LOG.info('Coin "%s" has been triggered.', self.name)
+        self.status.value = 'PRICE_CHANGE_TRIGGERED'
 
     def _check_success(self) -> None:
 
-        if (self.buys == self.stop_trigger['buys'] and
-                self.sells == self.stop_trigger['sells']):
-            LOG.info('Coin "{}" has succeeded'.format(self.name))
+        if self._deals() == self._stop_bs:
+            LOG.info('Coin "%s" has succeeded', self.name)
             self.is_triggered = False
-            self.status = 'SUCCEEDED'
+            self.status.value = 'SUCCEEDED'
 
         else:
-            LOG.warning(
-                'Coin "{}" has failed to succeed'.format(self.name))
+            LOG.warning('Coin "%s" has failed to succeed', self.name)
             self.is_triggered = False
-            self.status = 'FAILED'
-
-    def _increment_counter(self) -> None:
-        if self.counter < len(self.ticker['ticker']) - 1:
-            self.counter += 1
-
-        elif (self.counter == len(self.ticker['ticker']) - 1 and
-                self.is_infinite):
-            self.reset_counter()
+            self.status.value = 'FAILED'
 
     def reset_counter(self) -> None:
         self.counter = 0
@@ -358,6 +669,11 @@ class Strategy:
 class Deal:
     '''Basic deal'''
 
+    __slots__ = (
+        'api_key', 'amount', 'price', 'base_asset', 'quote_asset',
+        'deal_type', 'symbol'
+    )
+
     def __init__(
         self,
         api_key: str,
@@ -374,11 +690,19 @@ class Deal:
         self.base_asset: str = base_asset
         self.quote_asset: str = quote_asset
         self.deal_type: str = deal_type
+        self.symbol: str = f'{base_asset}_{quote_asset}'
 
 
 class Order(Deal):
     '''Implements basic order functionality'''
 
+    __slots__ = (
+        'id', 'order_type', 'created', 'status', 'context', 'trade_timers',
+        'order_fill_delay', 'number_of_trades', 'fill_percent', 'trades',
+        '_filled_count', '_filled_amount', '_filled_notional',
+        'trade_amount', 'trade_delay_step', '_exchange', '_lock'
+    )
+
     def __init__(
         self,
         api_key: str,
@@ -386,26 +710,26 @@ class Order(Deal):
         base_asset: str,
         quote_asset: str,
         order_type: str,
-        context: list,
-        random_fill: bool = True
+        context: Dict[str, Strategy],
+        random_fill: bool = True,
+        exchange: Optional[Exchange] = None
     ):
-        super().__init__()
+        super().__init__(
+            api_key, amount, 0.0, base_asset, quote_asset, order_type
+        )
         self.id: str = str(uuid4())
-        self.api_key: str = api_key
-        self.amount: float = amount
-        self.base_asset: str = base_asset
-        self.quote_asset: str = quote_asset
         self.order_type: str = order_type
-        self.created: int = int(round(time()))
+        self.created: int = int(time())
         self.status: str = 'OPEN'
-        self.trades: list = list()
-        self.context: list = context
-        self.symbol: str = ''.join([self.base_asset, '_', self.quote_asset])
+        self.context: Dict[str, Strategy] = context
 
-        self.price: float = self._get_original_price()
+        # exchange settling balances when order is filled or canceled
+        self._exchange: Optional[Exchange] = exchange
 
-        # timers for trades
-        self.trade_timers: list = list()
+        # serializes trades against cancel
+        self._lock: Lock = Lock()
+
+        self.price = self._get_original_price()
 
         # set time when order will be fully filled
         self.order_fill_delay: int = 15
@@ -420,6 +744,13 @@ class Order(Deal):
         if random_fill:
             self._compute_fill_properties()
 
+        # trades by slot index, number of filled slots
+        # and running totals of filled trades
+        self.trades: list = [None] * self.number_of_trades
+        self._filled_count: int = 0
+        self._filled_amount: float = 0.0
+        self._filled_notional: float = 0.0
+
         # TODO make it random
         # what amount will be traded per trade
         self.trade_amount: float = (
@@ -430,77 +761,91 @@ class Order(Deal):
             self.order_fill_delay / self.number_of_trades
         )
 
-        for i in range(self.number_of_trades):
-            # current delay for trade timer
-            current_trade_delay = (
-                self.trade_delay_step + i * self.trade_delay_step
-            )
-
-            # generate trade
-            current_trade = Trade(
-                self.id,
-                self.trade_amount,
-                self.base_asset,
-                self.quote_asset,
-                self.order_type,
-                self.context
+        # wheel handles for trades
+        created_at: float = monotonic()
+        self.trade_timers: List[list] = [
+            self._schedule_trade(
+                i, created_at + self.trade_delay_step * (i + 1)
             )
+            for i in range(self.number_of_trades)
+        ]
 
-            # start trade timer
-            current_trade_timer = Timer(
-                current_trade_delay,
-                self._handle_trade,
-                [current_trade]
+        if LOG.isEnabledFor(INFO):
+            LOG.info(
+                '%s order for %s with id %s for api key %s created',
+                self.order_type, self.symbol, self.id, self.api_key
             )
-            current_trade_timer.start()
-
-            self.trade_timers.append(current_trade_timer)
 
-        LOG.info(
-            '{} order for {} with id {} for api key {} created'.format(
-                self.order_type,
-                ''.join([self.base_asset, '_', self.quote_asset]),
-                self.id,
-                self.api_key
-            )
+    def _schedule_trade(self, slot: int, fire_at: float) -> list:
+        '''Generates trade for slot and schedules it on timer wheel'''
+
+        trade: Trade = Trade(
+            self.id,
+            self.api_key,
+            self.trade_amount,
+            self.base_asset,
+            self.quote_asset,
+            self.order_type,
+            self.context
         )
+        trade.slot = slot
+
+        return _WHEEL.schedule(fire_at, self._handle_trade, trade)
 
     def cancel(self) -> None:
         '''Cancels current order'''
 
-        # cancel all trade timers
-        for timer in self.trade_timers:
-            timer.cancel()
+        with self._lock:
+            if self.status != 'OPEN':
+                return
 
-        self.status = 'CANCELED'
+            # cancel all scheduled trades
+            for timer in self.trade_timers:
+                _WHEEL.cancel(timer)
 
-        LOG.info(
-            '{} order for {} with id {} canceled'.format(
-                self.order_type,
-                ''.join([self.base_asset, '_', self.quote_asset]),
-                self.id
-            )
-        )
+            self.status = 'CANCELED'
+
+            if LOG.isEnabledFor(INFO):
+                LOG.info(
+                    '%s order for %s with id %s canceled',
+                    self.order_type, self.symbol, self.id
+                )
+
+            self._settle()
 
     def _handle_trade(self, trade: Any) -> None:
         '''Handles trade routine for order'''
 
-        self.trades.append(trade)
-        self._check_close()
+        with self._lock:
+            # trade may be popped from wheel while order is canceled
+            if self.status != 'OPEN':
+                return
+
+            self.trades[trade.slot] = trade
+            self._filled_count += 1
+            self._filled_amount += trade.amount
+            self._filled_notional += trade.amount * trade.price
+            self._check_close()
+
+    def _settle(self) -> None:
+        '''Settles order balances on exchange'''
+
+        if self._exchange is not None:
+            self._exchange._handle_order_close(self)
 
     def _check_close(self) -> None:
         '''Checks condition for order close and closes it'''
 
-        if len(self.trades) == self.number_of_trades:
+        if self._filled_count == self.number_of_trades:
             self.status = 'FILLED'
 
-            LOG.info(
-                '{} order for {} with id {} closed'.format(
-                    self.order_type,
-                    ''.join([self.base_asset, '_', self.quote_asset]),
-                    self.id
+            if LOG.isEnabledFor(INFO):
+                LOG.info(
+                    '%s order for %s with id %s closed',
+                    self.order_type, self.symbol, self.id
                 )
-            )
+
+            self._settle()
 
     def _compute_fill_properties(self) -> None:
         self.number_of_trades = int(ceil(random() * 5))
@@ -509,47 +854,47 @@ class Order(Deal):
     def _get_original_price(self) -> float:
         '''Gets the symbol rate in moment of order creation '''
 
-        strategy: Any = [
-            strategy for strategy in self.context
-            if strategy.symbol == self.symbol
-        ][0]
-        price: float = float(strategy.ticker['ticker'][strategy.counter])
+        strategy: Any = self.context[self.symbol]
+        price: float = strategy._ticker_values[strategy.counter]
         return price
 
 
 class Trade(Deal):
     '''Implements basic trade functionality'''
 
+    __slots__ = (
+        'order_id', 'id', 'created', 'context', 'trade_type', 'slot'
+    )
+
     def __init__(
         self,
         order_id: str,
+        api_key: str,
         amount: float,
         base_asset: str,
         quote_asset: str,
         trade_type: str,
-        context: list
+        context: Dict[str, Strategy]
     ):
-        super().__init__()
+        super().__init__(
+            api_key, amount, 0.0, base_asset, quote_asset, trade_type
+        )
         self.order_id: str = order_id
         self.id: str = str(uuid4())
-        self.created: int = int(round(time()))
-        self.amount: float = amount
-        self.base_asset: str = base_asset
-        self.quote_asset: str = quote_asset
-        self.context: list = context
+        self.created: int = int(time())
+        self.context: Dict[str, Strategy] = context
         self.trade_type: str = trade_type
-        self.symbol: str = ''.join([self.base_asset, '_', self.quote_asset])
 
-        self.price: float = self._get_price()
+        # position of trade within its order
+        self.slot: int = 0
+
+        self.price = self._get_price()
 
     def _get_price(self) -> float:
         '''Gets the symbol rate in moment of trade creation '''
 
-        strategy: Any = [
-            strategy for strategy in self.context
-            if strategy.symbol == self.symbol
-        ][0]
-        price: float = float(strategy.ticker['ticker'][strategy.counter])
+        strategy: Any = self.context[self.symbol]
+        price: float = strategy._ticker_values[strategy.counter]
         return price
 
 
@@ -569,6 +914,8 @@ class ExchangeAccount(object):
 class Balance(object):
     '''basic balance'''
 
+    __slots__ = ('symbol', 'available', 'reserved', 'order_impacts')
+
     def __init__(self, symbol: str, available: float, reserved: float) -> None:
         self.symbol: str = symbol
         self.available: float = available
@@ -596,6 +943,8 @@ class Balance(object):
 class OrderImpact:
     '''object for order book records'''
 
+    __slots__ = ('order_id', 'reserved_amount')
+
     def __init__(self, order_id: str, reserved_amount: float) -> None:
         self.order_id: str = order_id
         self.reserved_amount: float = reserved_amount
@@ -604,11 +953,88 @@ class OrderImpact:
 # TODO excample: BinanceSocketHandler
 
 
-class Socket(WebsocketConsumer):
-    '''docstring for Socket'''
+# exchange served to socket clients
+_TICKER_GROUP: str = 'ticker'
 
-    def __init__(self) -> None:
-        super(Socket, self).__init__()
+# ticker producer and connected channels by exchange group
+_ticker_producers: Dict[str, asyncio.Task] = {}
+_ticker_channels: Dict[str, Set[str]] = {}
+
+
+async def _ticker_producer(
+    channel_layer: Any,
+    group: str,
+    exchange: Exchange
+) -> None:
+    '''Broadcasts exchange ticker to every connected socket'''
+
+    delta_size: float = 0.4
+
+    while True:
+        await asyncio.sleep(1 + choice((-1, 1)) * random() * delta_size)
+
+        try:
+            # serialize once for all sockets in group
+            await channel_layer.group_send(group, {
+                'type': 'ticker.message',
+                'text': dumps(exchange.prepare_ticker())
+            })
+
+        except Exception as err:
+            LOG.error(
+                'Ticker broadcast has failed with' +
+                ' the following error: %s', err)
+
+
+class ExchangeMiddleware:
+    '''Passes served exchange to socket consumers through scope'''
+
+    def __init__(self, inner: Any, exchange: Exchange) -> None:
+        self.inner: Any = inner
+        self.exchange: Exchange = exchange
+
+    def __call__(self, scope: dict) -> Any:
+        return self.inner(dict(scope, exchange=self.exchange))
+
+
+class Socket(AsyncWebsocketConsumer):
+    '''Streams exchange ticker to connected clients'''
+
+    async def connect(self) -> None:
+        self.exchange: Exchange = self.scope['exchange']
+        self.group: str = f'{_TICKER_GROUP}.{self.exchange.name}'
+
+        await self.channel_layer.group_add(self.group, self.channel_name)
+        await self.accept()
+
+        _ticker_channels.setdefault(self.group, set()).add(self.channel_name)
+
+        # single producer serves all sockets of exchange
+        producer: Optional[asyncio.Task] = _ticker_producers.get(self.group)
+        if producer is None or producer.done():
+            _ticker_producers[self.group] = asyncio.create_task(
+                _ticker_producer(self.channel_layer, self.group, self.exchange)
+            )
+
+        LOG.info('Accepted socket connection to channel %s', self.group)
+
+    async def disconnect(self, close_code: Any) -> None:
+        await self.channel_layer.group_discard(self.group, self.channel_name)
+
+        channels: Set[str] = _ticker_channels.get(self.group, set())
+        channels.discard(self.channel_name)
+
+        # stop producing ticker nobody listens to
+        if not channels:
+            _ticker_channels.pop(self.group, None)
+            producer: Optional[asyncio.Task] = _ticker_producers.pop(
+                self.group, None
+            )
+            if producer is not None:
+                producer.cancel()
+
+    async def ticker_message(self, event: dict) -> None:
+        await self.send(text_data=event['text'])
 
 
 # class BinanceSocketHandler(WebsocketConsumer):
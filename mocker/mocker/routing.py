@@ -2,11 +2,18 @@ from channels.auth import AuthMiddlewareStack
 from channels.routing import ProtocolTypeRouter, URLRouter
 
 import mocker.urls as urls
+from mocker.proto_mocks import Exchange, ExchangeMiddleware
+
+# exchange served to socket connections
+exchange: Exchange = Exchange()
 
 application = ProtocolTypeRouter({
     'websocket': AuthMiddlewareStack(
-        URLRouter(
-            urls.websocket_urlpatterns
+        ExchangeMiddleware(
+            URLRouter(
+                urls.websocket_urlpatterns
+            ),
+            exchange
         )
     ),
 })
@@ -75,6 +75,12 @@ CORS_ORIGIN_ALLOW_ALL = True
 
 ASGI_APPLICATION = 'mocker.routing.application'
 
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+    },
+}
+
 ROOT_URLCONF = 'mocker.urls'
 
 TEMPLATES = [